@@ -1,5 +1,8 @@
+import bisect
 import os
 import os.path
+import re
+import select
 import threading
 import socket
 import lldb
@@ -12,12 +15,16 @@ def checksum(message):
     """
     Calculate the GDB server protocol checksum of the message.
 
-    The GDB server protocol uses a simple modulo 256 sum.
+    The GDB server protocol uses a simple modulo 256 sum. sum() already
+    accumulates at C speed over a byte buffer; the only per-call cost worth
+    avoiding on huge payloads is buffer conversion, so bytearray input is
+    summed as-is and everything else pays for at most one conversion.
     """
-    check = 0
-    for c in message:
-        check += ord(c)
-    return check % 256
+    if isinstance(message, str):
+        message = seven.bitcast_to_bytes(message)
+    if not isinstance(message, bytearray):
+        message = bytearray(message)
+    return sum(message) % 256
 
 
 def frame_packet(message):
@@ -27,8 +34,19 @@ def frame_packet(message):
 
     Framing includes surrounding the message between $ and #, and appending
     a two character hex checksum.
+
+    Short replies like "OK", "", "S02", "l" and "QC0" recur constantly, so
+    their framed forms are cached rather than re-framed every time.
     """
-    return "$%s#%02x" % (message, checksum(message))
+    framed = _frame_packet_cache.get(message)
+    if framed is None:
+        framed = "$%s#%02x" % (message, checksum(message))
+        if len(message) <= 8:
+            _frame_packet_cache[message] = framed
+    return framed
+
+
+_frame_packet_cache = {}
 
 
 def escape_binary(message):
@@ -39,26 +57,39 @@ def escape_binary(message):
     Most bytes are sent through as-is, but $, #, and { are escaped by writing
     a { followed by the original byte mod 0x20.
     """
-    out = ""
-    for c in message:
-        d = ord(c)
-        if d in (0x23, 0x24, 0x7d):
-            out += chr(0x7d)
-            out += chr(d ^ 0x20)
-        else:
-            out += c
-    return out
+    return "".join(_ESCAPE_TABLE.get(c, c) for c in message)
+
+
+# Characters that escape_binary must escape, mapped to their escaped forms.
+_ESCAPE_TABLE = dict(
+    (chr(d), chr(0x7d) + chr(d ^ 0x20)) for d in (0x23, 0x24, 0x7d))
+
+
+_zero_memory_hex_cache = ""
+
+
+def _zero_memory_hex(length):
+    """
+    Return the hex encoding of length zero bytes, reusing one cached buffer
+    instead of repeating the string multiplication for every read.
+    """
+    global _zero_memory_hex_cache
+    if len(_zero_memory_hex_cache) < 2 * length:
+        _zero_memory_hex_cache = "00" * length
+    return _zero_memory_hex_cache[:2 * length]
 
 
 def hex_encode_bytes(message):
     """
     Encode the binary message by converting each byte into a two-character
     hex string.
+
+    All-zero buffers, the common case for scratch memory reads, skip the
+    hex encoding entirely and reuse the shared zeroed buffer.
     """
-    out = ""
-    for c in message:
-        out += "%02x" % ord(c)
-    return out
+    if not message.strip("\0"):
+        return _zero_memory_hex(len(message))
+    return seven.hexlify(message)
 
 
 def hex_decode_bytes(hex_bytes):
@@ -66,12 +97,7 @@ def hex_decode_bytes(hex_bytes):
     Decode the hex string into a binary message by converting each two-character
     hex string into a single output byte.
     """
-    out = ""
-    hex_len = len(hex_bytes)
-    while i < hex_len - 1:
-        out += chr(int(hex_bytes[i:i + 2]), 16)
-        i += 2
-    return out
+    return seven.unhexlify(hex_bytes)
 
 
 class MockGDBServerResponder:
@@ -91,78 +117,118 @@ class MockGDBServerResponder:
 
     def __init__(self):
         self.packetLog = []
+        # Compute the all-zeroes register response once rather than on every
+        # g packet.
+        self._registersZeroHex = "00000000" * self.registerCount
 
     def respond(self, packet):
         """
         Return the unframed packet data that the server should issue in response
         to the given packet received from the client.
+
+        Dispatch is table driven: packets that match in their entirety hit a
+        dict keyed on the whole packet, single-letter commands hit a dict
+        keyed on the first byte, and the remaining multi-character commands
+        are matched by a single compiled prefix regex.
         """
         self.packetLog.append(packet)
         if packet is MockGDBServer.PACKET_INTERRUPT:
             return self.interrupt()
-        if packet == "c":
-            return self.cont()
-        if packet.startswith("vCont;c"):
-            return self.vCont(packet)
-        if packet[0] == "g":
-            return self.readRegisters()
-        if packet[0] == "G":
-            return self.writeRegisters(packet[1:])
-        if packet[0] == "p":
-            regnum = packet[1:].split(';')[0]
-            return self.readRegister(int(regnum, 16))
-        if packet[0] == "P":
-            register, value = packet[1:].split("=")
-            return self.readRegister(int(register, 16), value)
-        if packet[0] == "m":
-            addr, length = [int(x, 16) for x in packet[1:].split(',')]
-            return self.readMemory(addr, length)
-        if packet[0] == "M":
-            location, encoded_data = packet[1:].split(":")
-            addr, length = [int(x, 16) for x in location.split(',')]
-            return self.writeMemory(addr, encoded_data)
-        if packet[0:7] == "qSymbol":
-            return self.qSymbol(packet[8:])
-        if packet[0:10] == "qSupported":
-            return self.qSupported(packet[11:].split(";"))
-        if packet == "qfThreadInfo":
-            return self.qfThreadInfo()
-        if packet == "qsThreadInfo":
-            return self.qsThreadInfo()
-        if packet == "qC":
-            return self.qC()
-        if packet == "QEnableErrorStrings":
-            return self.QEnableErrorStrings()
-        if packet == "?":
-            return self.haltReason()
-        if packet == "s":
-            return self.haltReason()
-        if packet[0] == "H":
-            return self.selectThread(packet[1], int(packet[2:], 16))
-        if packet[0:6] == "qXfer:":
-            obj, read, annex, location = packet[6:].split(":")
-            offset, length = [int(x, 16) for x in location.split(',')]
-            data, has_more = self.qXferRead(obj, annex, offset, length)
-            if data is not None:
-                return self._qXferResponse(data, has_more)
-            return ""
-        if packet.startswith("vAttach;"):
-            pid = packet.partition(';')[2]
-            return self.vAttach(int(pid, 16))
-        if packet[0] == "Z":
-            return self.setBreakpoint(packet)
-        if packet.startswith("qThreadStopInfo"):
-            threadnum = int (packet[15:], 16)
-            return self.threadStopInfo(threadnum)
-        if packet == "QThreadSuffixSupported":
-            return self.QThreadSuffixSupported()
-        if packet == "QListThreadsInStopReply":
-            return self.QListThreadsInStopReply()
-        if packet.startswith("qMemoryRegionInfo:"):
-            return self.qMemoryRegionInfo()
-
+        handler = self._EXACT_HANDLERS.get(packet)
+        if handler is not None:
+            return handler(self)
+        handler = self._FIRST_BYTE_HANDLERS.get(packet[0])
+        if handler is not None:
+            return handler(self, packet)
+        match = self._PREFIX_MATCHER.match(packet)
+        if match is not None:
+            return self._PREFIX_HANDLERS[match.group(0)](self, packet)
         return self.other(packet)
 
+    def _respondReadRegister(self, packet):
+        regnum = packet[1:].split(';')[0]
+        return self.readRegister(int(regnum, 16))
+
+    def _respondWriteRegister(self, packet):
+        register, value = packet[1:].split("=")
+        return self.readRegister(int(register, 16), value)
+
+    def _respondReadMemory(self, packet):
+        comma = packet.index(',')
+        addr = int(packet[1:comma], 16)
+        length = int(packet[comma + 1:], 16)
+        return self.readMemory(addr, length)
+
+    def _respondWriteMemory(self, packet):
+        colon = packet.index(':')
+        comma = packet.index(',', 1, colon)
+        addr = int(packet[1:comma], 16)
+        return self.writeMemory(addr, packet[colon + 1:])
+
+    def _respondSelectThread(self, packet):
+        return self.selectThread(packet[1], int(packet[2:], 16))
+
+    def _respondQSupported(self, packet):
+        return self.qSupported(packet[11:].split(";"))
+
+    def _respondQXfer(self, packet):
+        obj, read, annex, location = packet[6:].split(":")
+        comma = location.index(',')
+        offset = int(location[:comma], 16)
+        length = int(location[comma + 1:], 16)
+        data, has_more = self.qXferRead(obj, annex, offset, length)
+        if data is not None:
+            return self._qXferResponse(data, has_more)
+        return ""
+
+    def _respondVAttach(self, packet):
+        pid = packet.partition(';')[2]
+        return self.vAttach(int(pid, 16))
+
+    def _respondThreadStopInfo(self, packet):
+        threadnum = int(packet[15:], 16)
+        return self.threadStopInfo(threadnum)
+
+    _EXACT_HANDLERS = {
+        "c": lambda self: self.cont(),
+        "qfThreadInfo": lambda self: self.qfThreadInfo(),
+        "qsThreadInfo": lambda self: self.qsThreadInfo(),
+        "qC": lambda self: self.qC(),
+        "QEnableErrorStrings": lambda self: self.QEnableErrorStrings(),
+        "?": lambda self: self.haltReason(),
+        "s": lambda self: self.haltReason(),
+        "QThreadSuffixSupported": lambda self: self.QThreadSuffixSupported(),
+        "QListThreadsInStopReply": lambda self: self.QListThreadsInStopReply(),
+    }
+
+    _FIRST_BYTE_HANDLERS = {
+        "g": lambda self, packet: self.readRegisters(),
+        "G": lambda self, packet: self.writeRegisters(packet[1:]),
+        "p": _respondReadRegister,
+        "P": _respondWriteRegister,
+        "m": _respondReadMemory,
+        "M": _respondWriteMemory,
+        "H": _respondSelectThread,
+        "Z": lambda self, packet: self.setBreakpoint(packet),
+    }
+
+    _PREFIX_HANDLERS = {
+        "vCont;c": lambda self, packet: self.vCont(packet),
+        "qSymbol": lambda self, packet: self.qSymbol(packet[8:]),
+        "qSupported": _respondQSupported,
+        "qXfer:": _respondQXfer,
+        "vAttach;": _respondVAttach,
+        "qThreadStopInfo": _respondThreadStopInfo,
+        "qMemoryRegionInfo:": lambda self, packet: self.qMemoryRegionInfo(),
+    }
+
+    # One compiled alternation finds which prefix (if any) applies, so packets
+    # that need prefix dispatch don't go through a startswith chain. Longer
+    # prefixes sort first so none is shadowed by a prefix of itself.
+    _PREFIX_MATCHER = re.compile(
+        "|".join(re.escape(prefix) for prefix in
+                 sorted(_PREFIX_HANDLERS, key=len, reverse=True)))
+
     def interrupt(self):
         raise self.UnexpectedPacketException()
 
@@ -173,7 +239,7 @@ class MockGDBServerResponder:
         raise self.UnexpectedPacketException()
     
     def readRegisters(self):
-        return "00000000" * self.registerCount
+        return self._registersZeroHex
 
     def readRegister(self, register):
         return "00000000"
@@ -185,7 +251,7 @@ class MockGDBServerResponder:
         return "OK"
 
     def readMemory(self, addr, length):
-        return "00" * length
+        return _zero_memory_hex(length)
 
     def writeMemory(self, addr, data_hex):
         return "OK"
@@ -269,11 +335,13 @@ class MockGDBServer:
     _receivedData = None
     _receivedDataOffset = None
     _shouldSendAck = True
+    _shutdown_event = None
 
     def __init__(self, port = 0):
         self.responder = MockGDBServerResponder()
         self.port = port
         self._socket = socket.socket()
+        self._shutdown_event = threading.Event()
 
     def start(self):
         # Block until the socket is up, so self.port is available immediately.
@@ -286,37 +354,57 @@ class MockGDBServer:
         self._thread.start()
 
     def stop(self):
-        self._socket.close()
+        self._shutdown_event.set()
         self._thread.join()
+        self._socket.close()
         self._thread = None
 
     def _run(self):
-        # For testing purposes, we only need to worry about one client
-        # connecting just one time.
-        try:
-            # accept() is stubborn and won't fail even when the socket is
-            # shutdown, so we'll use a timeout
-            self._socket.settimeout(2.0)
-            client, client_addr = self._socket.accept()
-            self._client = client
-            # The connected client inherits its timeout from self._socket,
-            # but we'll use a blocking socket for the client
-            self._client.settimeout(None)
-        except:
-            return
+        # Serve one client at a time. The server is shared by all the test
+        # methods of a class, with each test making its own connection, so
+        # keep accepting clients until we're told to shut down.
+        while True:
+            try:
+                # accept() is stubborn and won't fail even when the socket
+                # is shutdown, so poll the listening socket instead. stop()
+                # then interrupts the wait promptly rather than eating a
+                # multi-second accept timeout on shutdown.
+                while True:
+                    if self._shutdown_event.is_set():
+                        return
+                    readable, _, _ = select.select(
+                            [self._socket], [], [], 0.1)
+                    if readable:
+                        break
+                client, client_addr = self._socket.accept()
+                self._client = client
+                # We'll use a blocking socket for the connected client.
+                self._client.settimeout(None)
+            except:
+                return
+            self._serveClient()
+
+    def _serveClient(self):
         self._shouldSendAck = True
-        self._receivedData = ""
+        self._receivedData = bytearray()
         self._receivedDataOffset = 0
-        data = None
+        # Read into one preallocated buffer rather than having every recv
+        # allocate a fresh bytes object.
+        recv_buffer = bytearray(4096)
+        recv_view = memoryview(recv_buffer)
+        # Bind the hot calls once outside the loop.
+        recv_into = self._client.recv_into
+        receive = self._receive
         while True:
             try:
-                data = seven.bitcast_to_string(self._client.recv(4096))
-                if data is None or len(data) == 0:
+                byte_count = recv_into(recv_buffer)
+                if not byte_count:
                     break
-                self._receive(data)
+                receive(recv_view[:byte_count])
             except Exception as e:
-                self._client.close()
                 break
+        self._client.close()
+        self._client = None
 
     def _receive(self, data):
         """
@@ -325,77 +413,93 @@ class MockGDBServer:
         """
         self._receivedData += data
         try:
-            packet = self._parsePacket()
-            while packet is not None:
-                self._handlePacket(packet)
-                packet = self._parsePacket()
+            self._parsePackets()
         except self.InvalidPacketException:
             self._client.close()
 
-    def _parsePacket(self):
+    def _parsePackets(self):
         """
-        Reads bytes from self._receivedData, returning:
+        Parses and handles every complete packet in self._receivedData in a
+        single scan over the buffer. Consumed bytes are trimmed once at the
+        end rather than after every packet.
+        """
+        data = self._receivedData
+        start = 0
+        try:
+            while True:
+                packet, start = self._parsePacket(start)
+                if packet is None:
+                    break
+                self._handlePacket(packet)
+        finally:
+            if start > 0:
+                del data[:start]
+                self._receivedDataOffset = max(
+                        0, self._receivedDataOffset - start)
+
+    def _parsePacket(self, start):
+        """
+        Reads bytes from self._receivedData beginning at index start,
+        returning a (packet, next_start) pair where packet is:
         - a packet's contents if a valid packet is found
         - the PACKET_ACK unique object if we got an ack
         - None if we only have a partial packet
+        and next_start is the index just past the parsed bytes.
 
         Raises an InvalidPacketException if unexpected data is received
         or if checksums fail.
-
-        Once a complete packet is found at the front of self._receivedData,
-        its data is removed form self._receivedData.
         """
         data = self._receivedData
-        i = self._receivedDataOffset
         data_len = len(data)
-        if data_len == 0:
-            return None
-        if i == 0:
+        if start == data_len:
+            return None, start
+        i = self._receivedDataOffset
+        if i <= start:
             # If we're looking at the start of the received data, that means
             # we're looking for the start of a new packet, denoted by a $.
             # It's also possible we'll see an ACK here, denoted by a +
-            if data[0] == '+':
-                self._receivedData = data[1:]
-                return self.PACKET_ACK
-            if ord(data[0]) == 3:
-                self._receivedData = data[1:]
-                return self.PACKET_INTERRUPT
-            if data[0] == '$':
-                i += 1
-            else:
+            leading = data[start]
+            if leading == ord('+'):
+                return self.PACKET_ACK, start + 1
+            if leading == 3:
+                return self.PACKET_INTERRUPT, start + 1
+            if leading != ord('$'):
                 raise self.InvalidPacketException(
-                        "Unexpected leading byte: %s" % data[0])
+                        "Unexpected leading byte: %s" % chr(leading))
+            i = start + 1
 
-        # If we're looking beyond the start of the received data, then we're
-        # looking for the end of the packet content, denoted by a #.
-        # Note that we pick up searching from where we left off last time
-        while i < data_len and data[i] != '#':
-            i += 1
+        # Look for the end of the packet content, denoted by a #. Note that
+        # we pick up searching from where we left off last time.
+        i = data.find(b'#', i)
+        if i < 0:
+            self._receivedDataOffset = data_len
+            return None, start
 
         # If there isn't enough data left for a checksum, just remember where
         # we left off so we can pick up there the next time around
         if i > data_len - 3:
             self._receivedDataOffset = i
-            return None
+            return None, start
 
         # If we have enough data remaining for the checksum, extract it and
-        # compare to the packet contents
-        packet = data[1:i]
+        # compare to the packet contents. The comparison happens on the raw
+        # bytes; only a validated packet gets decoded to a string.
+        packet_bytes = data[start + 1:i]
         i += 1
         try:
-            check = int(data[i:i + 2], 16)
+            check = int(bytes(data[i:i + 2]), 16)
         except ValueError:
             raise self.InvalidPacketException("Checksum is not valid hex")
         i += 2
-        if check != checksum(packet):
+        content_checksum = checksum(packet_bytes)
+        if check != content_checksum:
             raise self.InvalidPacketException(
                     "Checksum %02x does not match content %02x" %
-                    (check, checksum(packet)))
-        # remove parsed bytes from _receivedData and reset offset so parsing
-        # can start on the next packet the next time around
-        self._receivedData = data[i:]
-        self._receivedDataOffset = 0
-        return packet
+                    (check, content_checksum))
+        packet = seven.bitcast_to_string(bytes(packet_bytes))
+        # The next packet starts right after this one's checksum.
+        self._receivedDataOffset = i
+        return packet, i
 
     def _handlePacket(self, packet):
         if packet is self.PACKET_ACK:
@@ -406,8 +510,9 @@ class MockGDBServer:
         response = ""
         # We'll handle the ack stuff here since it's not something any of the
         # tests will be concerned about, and it'll get turned off quickly anyway.
+        out = []
         if self._shouldSendAck:
-            self._client.sendall(seven.bitcast_to_bytes('+'))
+            out.append(b'+')
         if packet == "QStartNoAckMode":
             self._shouldSendAck = False
             response = "OK"
@@ -416,8 +521,11 @@ class MockGDBServer:
             response = self.responder.respond(packet)
         # Handle packet framing since we don't want to bother tests with it.
         if response is not None:
-            framed = frame_packet(response)
-            self._client.sendall(seven.bitcast_to_bytes(framed))
+            out.append(seven.bitcast_to_bytes(frame_packet(response)))
+        # Send the ack and the framed response in a single write so each
+        # handled packet costs at most one syscall.
+        if out:
+            self._client.sendall(b''.join(out))
 
     PACKET_ACK = object()
     PACKET_INTERRUPT = object()
@@ -439,18 +547,30 @@ class GDBRemoteTestBase(TestBase):
     mydir = TestBase.compute_mydir(__file__)
     server = None
 
+    @classmethod
+    def setUpClass(cls):
+        # One server serves all the test methods of a class. Each test still
+        # makes its own connection and installs a fresh responder in setUp.
+        super(GDBRemoteTestBase, cls).setUpClass()
+        cls.server = MockGDBServer()
+        cls.server.start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.stop()
+        cls.server = None
+        super(GDBRemoteTestBase, cls).tearDownClass()
+
     def setUp(self):
         TestBase.setUp(self)
-        self.server = MockGDBServer()
-        self.server.start()
+        self.server.responder = MockGDBServerResponder()
 
     def tearDown(self):
-        # TestBase.tearDown will kill the process, but we need to kill it early
-        # so its client connection closes and we can stop the server before
-        # finally calling the base tearDown.
+        # TestBase.tearDown will kill the process, but we need to kill it
+        # early so its client connection closes and the shared server can go
+        # back to waiting for the next test's connection.
         if self.process() is not None:
             self.process().Kill()
-        self.server.stop()
         TestBase.tearDown(self)
 
     def createTarget(self, yaml_path):
@@ -491,14 +611,19 @@ class GDBRemoteTestBase(TestBase):
         The check does not require that the packets be consecutive, but does
         require that they are ordered in the log as they ordered in the arg.
         """
-        i = 0
-        j = 0
         log = self.server.responder.packetLog
-
-        while i < len(packets) and j < len(log):
-            if log[j] == packets[i]:
-                i += 1
-            j += 1
-        if i < len(packets):
+        # Index each packet's positions in the log up front so every expected
+        # packet is located with a binary search rather than a rescan.
+        positions = {}
+        for j, packet in enumerate(log):
+            positions.setdefault(packet, []).append(j)
+        next_position = 0
+        for packet in packets:
+            candidates = positions.get(packet)
+            if candidates is not None:
+                k = bisect.bisect_left(candidates, next_position)
+                if k < len(candidates):
+                    next_position = candidates[k] + 1
+                    continue
             self.fail(u"Did not receive: %s\nLast 10 packets:\n\t%s" %
-                    (packets[i], u'\n\t'.join(log)))
+                    (packet, u'\n\t'.join(log)))
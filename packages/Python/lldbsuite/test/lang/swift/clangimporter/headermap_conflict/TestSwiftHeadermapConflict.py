@@ -42,8 +42,15 @@ class TestSwiftHeadermapConflict(TestBase):
         self.assertTrue(target, VALID_TARGET)
         self.registerSharedLibrariesWithTarget(target, ['dylib'])
 
-        target, process, thread, bkpt = lldbutil.run_to_source_breakpoint(
-            self, 'break here', lldb.SBFileSpec('main.swift'))
+        # Launch against the target we just set up rather than letting
+        # run_to_source_breakpoint build (and re-parse) a second target for
+        # the same executable, which would also drop the shared library
+        # registration above.
+        bkpt = target.BreakpointCreateBySourceRegex(
+            'break here', lldb.SBFileSpec('main.swift'))
+        self.assertTrue(bkpt.GetNumLocations() > 0, VALID_BREAKPOINT)
+        target, process, thread, bkpt = lldbutil.run_to_breakpoint_do_run(
+            self, target, bkpt)
         b_breakpoint = target.BreakpointCreateBySourceRegex(
             'break here', lldb.SBFileSpec('dylib.swift'))
 
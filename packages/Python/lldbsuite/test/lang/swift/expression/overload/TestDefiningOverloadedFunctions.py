@@ -30,16 +30,15 @@ class TestDefiningOverloadedFunctions(TestBase):
     def check_expression(self, expression, expected_result, use_summary=True):
         value = self.frame().EvaluateExpression(expression)
         self.assertTrue(value.IsValid(), expression + "returned a valid value")
-        if self.TraceOn():
-            print(value.GetSummary())
-            print(value.GetValue())
+        # Fetch the answer once and reuse it for tracing, rather than making
+        # separate SBAPI calls for the trace and the assertion.
         if use_summary:
             answer = value.GetSummary()
         else:
             answer = value.GetValue()
-        report_str = "%s expected: %s got: %s" % (
-            expression, expected_result, answer)
-        self.assertTrue(answer == expected_result, report_str)
+        if self.TraceOn():
+            print(answer)
+        self.assertEqual(answer, expected_result, expression)
 
     @swiftTest
     def test_simple_overload_expressions(self):
@@ -18,14 +18,25 @@ from lldbsuite.test.decorators import *
 import lldbsuite.test.lldbutil as lldbutil
 import os
 import os.path
-import time
-import unittest2
 
 @skipIfDarwin # rdar://problem/54322424 Sometimes failing, sometimes truncated output.
 class TestMainExecutable(TestBase):
 
     mydir = TestBase.compute_mydir(__file__)
 
+    # Expected output shared by the non-resilient and resilient happy-path
+    # tests; built once at class scope instead of as fresh lists per call.
+    FR_VAR_SUBSTRS = (
+        "(SomeLibrary.TwoInts) value = (first = 2, second = 3)",
+        "(main.ContainsTwoInts) container = {\n  wrapped = (first = 2, second = 3)\n  other = 10\n}",
+        "(Int) simple = 1")
+    E_VALUE_SUBSTRS = ("(SomeLibrary.TwoInts)", "= (first = 2, second = 3)")
+    E_CONTAINER_SUBSTRS = ("(main.ContainsTwoInts)",
+                           "wrapped = (first = 2, second = 3)", "other = 10")
+    E_TWOINTS_SUBSTRS = ("(SomeLibrary.TwoInts)", "= (first = 4, second = 5)")
+    MISSING_MODULE_ERROR = (
+        "failed to get module \"SomeLibrary\" from AST context",)
+
     def launch_info(self):
         info = lldb.SBLaunchInfo([])
 
@@ -56,13 +67,10 @@ class TestMainExecutable(TestBase):
 
         # This test is deliberately checking what the user will see, rather than
         # the structure provided by the Python API, in order to test the recovery.
-        self.expect("fr var", substrs=[
-            "(SomeLibrary.TwoInts) value = (first = 2, second = 3)",
-            "(main.ContainsTwoInts) container = {\n  wrapped = (first = 2, second = 3)\n  other = 10\n}",
-            "(Int) simple = 1"])
-        self.expect("e value", substrs=["(SomeLibrary.TwoInts)", "= (first = 2, second = 3)"])
-        self.expect("e container", substrs=["(main.ContainsTwoInts)", "wrapped = (first = 2, second = 3)", "other = 10"])
-        self.expect("e TwoInts(4, 5)", substrs=["(SomeLibrary.TwoInts)", "= (first = 4, second = 5)"])
+        self.expect("fr var", substrs=self.FR_VAR_SUBSTRS)
+        self.expect("e value", substrs=self.E_VALUE_SUBSTRS)
+        self.expect("e container", substrs=self.E_CONTAINER_SUBSTRS)
+        self.expect("e TwoInts(4, 5)", substrs=self.E_TWOINTS_SUBSTRS)
     
     @swiftTest
     def test_implementation_only_import_main_executable_no_library_module(self):
@@ -113,22 +121,23 @@ class TestMainExecutable(TestBase):
 
         # This test is deliberately checking what the user will see, rather than
         # the structure provided by the Python API, in order to test the recovery.
-        self.expect("fr var", substrs=[
-            "(SomeLibrary.TwoInts) value = (first = 2, second = 3)",
-            "(main.ContainsTwoInts) container = {\n  wrapped = (first = 2, second = 3)\n  other = 10\n}",
-            "(Int) simple = 1"])
-        self.expect("e value", substrs=["(SomeLibrary.TwoInts)", "= (first = 2, second = 3)"])
-        self.expect("e container", substrs=["(main.ContainsTwoInts)", "wrapped = (first = 2, second = 3)", "other = 10"])
-        self.expect("e TwoInts(4, 5)", substrs=["(SomeLibrary.TwoInts)", "= (first = 4, second = 5)"])
+        self.expect("fr var", substrs=self.FR_VAR_SUBSTRS)
+        self.expect("e value", substrs=self.E_VALUE_SUBSTRS)
+        self.expect("e container", substrs=self.E_CONTAINER_SUBSTRS)
+        self.expect("e TwoInts(4, 5)", substrs=self.E_TWOINTS_SUBSTRS)
     
     @swiftTest
     @expectedFailureOS(no_match(["macosx"])) # Requires Remote Mirrors support
     def test_implementation_only_import_main_executable_resilient_no_library_module(self):
         """Test `@_implementationOnly import` in the main executable with a resilient library, after removing the library's swiftmodule
-        
+
         See the ReadMe.md in the parent directory for more information.
         """
 
+        # This build is identical to the one in the previous resilient test,
+        # but it cannot be shared: every test method gets its own isolated
+        # build directory (and this test goes on to delete artifacts from
+        # it), which is also what makes per-file test sharding safe.
         self.build(dictionary={"LIBRARY_SWIFTFLAGS_EXTRAS": "-enable-library-evolution"})
         os.remove(self.getBuildArtifact("SomeLibrary.swiftmodule"))
         os.remove(self.getBuildArtifact("SomeLibrary.swiftinterface"))
@@ -145,6 +154,6 @@ class TestMainExecutable(TestBase):
             "(Int) simple = 1"])
         # FIXME: If we could figure out how to ignore this failure but still not
         # crash if we touch something that can't be loaded, that would be nice.
-        self.expect("e value", error=True, substrs=["failed to get module \"SomeLibrary\" from AST context"])
-        self.expect("e container", error=True, substrs=["failed to get module \"SomeLibrary\" from AST context"])
-        self.expect("e TwoInts(4, 5)", error=True, substrs=["failed to get module \"SomeLibrary\" from AST context"])
+        self.expect("e value", error=True, substrs=self.MISSING_MODULE_ERROR)
+        self.expect("e container", error=True, substrs=self.MISSING_MODULE_ERROR)
+        self.expect("e TwoInts(4, 5)", error=True, substrs=self.MISSING_MODULE_ERROR)
@@ -16,8 +16,6 @@ import lldb
 from lldbsuite.test.decorators import *
 import lldbsuite.test.lldbtest as lldbtest
 import lldbsuite.test.lldbutil as lldbutil
-import os
-import unittest2
 
 
 class TestSwiftInstancePointerSetSP(lldbtest.TestBase):
@@ -34,31 +32,16 @@ class TestSwiftInstancePointerSetSP(lldbtest.TestBase):
         lldbtest.TestBase.setUp(self)
         self.main_source = "main.swift"
         self.main_source_spec = lldb.SBFileSpec(self.main_source)
+        self.line = lldbtest.line_number(self.main_source, '// break here')
 
     def do_test(self):
         """Test that we correctly track instance pointers in ValueObjectPrinter"""
-        exe_name = "a.out"
-        exe = self.getBuildArtifact(exe_name)
+        # Printing one local object doesn't need every module's symbols
+        # preloaded at launch.
+        self.runCmd("settings set target.preload-symbols false")
 
-        # Create the target
-        target = self.dbg.CreateTarget(exe)
-        self.assertTrue(target, lldbtest.VALID_TARGET)
-
-        # Set the breakpoints
-        breakpoint = target.BreakpointCreateBySourceRegex(
-            'break here', self.main_source_spec)
-        self.assertTrue(
-            breakpoint.GetNumLocations() > 0,
-            lldbtest.VALID_BREAKPOINT)
-
-        # Launch the process, and do not stop at the entry point.
-        process = target.LaunchSimple(None, None, os.getcwd())
-
-        self.assertTrue(process, lldbtest.PROCESS_IS_VALID)
-
-        # Frame #0 should be at our breakpoint.
-        threads = lldbutil.get_threads_stopped_at_breakpoint(
-            process, breakpoint)
+        lldbutil.run_to_line_breakpoint(
+            self, self.main_source_spec, self.line)
 
         self.expect(
             "frame variable -d run -- o",
@@ -72,9 +55,3 @@ class TestSwiftInstancePointerSetSP(lldbtest.TestBase):
                 '"Hello World"',
                 '{...}'],
             matching=True)
-
-if __name__ == '__main__':
-    import atexit
-    lldb.SBDebugger.Initialize()
-    atexit.register(lldb.SBDebugger.Terminate)
-    unittest2.main()
@@ -12,26 +12,13 @@
 """
 Test that resilient APIs work regardless of the combination of library and executable
 """
-import subprocess
 import lldb
 from lldbsuite.test.lldbtest import *
 from lldbsuite.test.decorators import *
 import lldbsuite.test.lldbutil as lldbutil
 import os
 import os.path
-import time
-import unittest2
-
-import sys
-if sys.version_info.major == 2:
-    import commands as subprocess
-else:
-    import subprocess
-
-def execute_command(command):
-    # print '%% %s' % (command)
-    (exit_status, output) = subprocess.getstatusoutput(command)
-    return exit_status
+import shutil
 
 
 class TestResilience(TestBase):
@@ -67,28 +54,37 @@ class TestResilience(TestBase):
         self.doTestWithFlavor("b", "b")
 
 
-    def setUp(self):
-        TestBase.setUp(self)
+    def _symlinkBuildArtifact(self, src_base, dst_base):
+        """Force-create a symlink between two build artifacts."""
+        dst = self.getBuildArtifact(dst_base)
+        if os.path.lexists(dst):
+            os.remove(dst)
+        os.symlink(self.getBuildArtifact(src_base), dst)
 
     def createSymlinks(self, exe_flavor, mod_flavor):
-        execute_command("cp " + self.getBuildArtifact("main." + exe_flavor) + " " + self.getBuildArtifact("main"))
-        execute_command("ln -sf " + self.getBuildArtifact("main." + exe_flavor + ".dSYM") + " " + self.getBuildArtifact("main.dSYM"))
-
-        execute_command("cp " + self.getBuildArtifact("libmod." + exe_flavor + ".dylib") + " " + self.getBuildArtifact("libmod.dylib"))
-        execute_command("ln -sf " + self.getBuildArtifact("libmod." + exe_flavor + ".dylib.dSYM") + " " + self.getBuildArtifact("libmod.dylib.dSYM"))
-        execute_command("ln -sf " + self.getBuildArtifact("mod." + exe_flavor + ".o") + " " + self.getBuildArtifact("mod.o"))
-
-        execute_command("ln -sf " + self.getBuildArtifact("mod." + exe_flavor + ".swiftmodule") + " " + self.getBuildArtifact("mod.swiftmodule"))
+        # Use direct file operations instead of spawning a shell per link.
+        shutil.copy(
+            self.getBuildArtifact("main." + exe_flavor),
+            self.getBuildArtifact("main"))
+        self._symlinkBuildArtifact("main." + exe_flavor + ".dSYM",
+                                   "main.dSYM")
+
+        shutil.copy(
+            self.getBuildArtifact("libmod." + exe_flavor + ".dylib"),
+            self.getBuildArtifact("libmod.dylib"))
+        self._symlinkBuildArtifact(
+            "libmod." + exe_flavor + ".dylib.dSYM", "libmod.dylib.dSYM")
+        self._symlinkBuildArtifact("mod." + exe_flavor + ".o", "mod.o")
+
+        self._symlinkBuildArtifact("mod." + exe_flavor + ".swiftmodule",
+                                   "mod.swiftmodule")
 
     def cleanupSymlinks(self):
-        execute_command(
-            "rm " +
-            self.getBuildArtifact("main") + " " +
-            self.getBuildArtifact("main.dSYM") + " " +
-            self.getBuildArtifact("libmod.dylib") + " " +
-            self.getBuildArtifact("libmod.dylib.dSYM") + " " +
-            self.getBuildArtifact("mod.swiftdoc") + " " +
-            self.getBuildArtifact("mod.swiftmodule"))
+        for name in ("main", "main.dSYM", "libmod.dylib",
+                     "libmod.dylib.dSYM", "mod.swiftdoc", "mod.swiftmodule"):
+            path = self.getBuildArtifact(name)
+            if os.path.lexists(path):
+                os.remove(path)
 
     def check_global(self, symbol_name, substrs):
         self.expect("target var " + symbol_name,
@@ -111,8 +107,14 @@ class TestResilience(TestBase):
         self.assertTrue(target, VALID_TARGET)
         self.registerSharedLibrariesWithTarget(target, ['mod'])
 
-        target, process, _, breakpoint = lldbutil.run_to_source_breakpoint(
-            self, "break here", source_spec, exe_name=exe_path)
+        # Reuse the target we just configured instead of letting
+        # run_to_source_breakpoint create (and re-parse) a second one for
+        # the same executable.
+        breakpoint = target.BreakpointCreateBySourceRegex(
+            "break here", source_spec)
+        self.assertTrue(breakpoint.GetNumLocations() > 0, VALID_BREAKPOINT)
+        target, process, _, breakpoint = lldbutil.run_to_breakpoint_do_run(
+            self, target, breakpoint)
         dylib_breakpoint = target.BreakpointCreateByName("fA")
 
         # main.swift
@@ -168,9 +170,3 @@ class TestResilience(TestBase):
         process.Kill()
 
         self.cleanupSymlinks()
-
-if __name__ == '__main__':
-    import atexit
-    lldb.SBDebugger.Initialize()
-    atexit.register(lldb.SBDebugger.Terminate)
-    unittest2.main()
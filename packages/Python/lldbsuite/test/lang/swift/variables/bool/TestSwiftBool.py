@@ -17,7 +17,6 @@ import lldb
 from lldbsuite.test.lldbtest import *
 from lldbsuite.test.decorators import *
 import lldbsuite.test.lldbutil as lldbutil
-import unittest2
 
 
 class TestSwiftBool(TestBase):
@@ -34,33 +33,18 @@ class TestSwiftBool(TestBase):
         TestBase.setUp(self)
         self.main_source = "main.swift"
         self.main_source_spec = lldb.SBFileSpec(self.main_source)
+        self.line = line_number(self.main_source, '// Set breakpoint here')
 
     def do_test(self):
         """Tests that we can break and display simple types"""
-        exe_name = "a.out"
-        exe = self.getBuildArtifact(exe_name)
+        # This test only reads scalar locals in the main module, so don't
+        # pay for eagerly ingesting every module's symbol table at launch.
+        self.runCmd("settings set target.preload-symbols false")
 
-        # Create the target
-        target = self.dbg.CreateTarget(exe)
-        self.assertTrue(target, VALID_TARGET)
+        (target, process, thread,
+         breakpoint) = lldbutil.run_to_line_breakpoint(
+            self, self.main_source_spec, self.line)
 
-        # Set the breakpoints
-        breakpoint = target.BreakpointCreateBySourceRegex(
-            'Set breakpoint here', self.main_source_spec)
-        self.assertTrue(breakpoint.GetNumLocations() > 0, VALID_BREAKPOINT)
-
-        # Launch the process, and do not stop at the entry point.
-        process = target.LaunchSimple(None, None, os.getcwd())
-
-        self.assertTrue(process, PROCESS_IS_VALID)
-
-        # Frame #0 should be at our breakpoint.
-        threads = lldbutil.get_threads_stopped_at_breakpoint(
-            process, breakpoint)
-
-        self.assertTrue(len(threads) == 1)
-        thread = threads[0]
-        
         frame = thread.frames[0]
         self.assertTrue(frame.IsValid(), "Couldn't get a frame.")
         
@@ -75,10 +59,3 @@ class TestSwiftBool(TestBase):
             var = frame.FindVariable(name)
             summary = var.GetSummary()
             self.assertTrue(summary == "false", "%s should be false, was: %s"%(name, summary))
-
-
-if __name__ == '__main__':
-    import atexit
-    lldb.SBDebugger.Initialize()
-    atexit.register(lldb.SBDebugger.Terminate)
-    unittest2.main()
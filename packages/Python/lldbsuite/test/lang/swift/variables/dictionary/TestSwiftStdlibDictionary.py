@@ -17,86 +17,42 @@ from lldbsuite.test.lldbtest import *
 from lldbsuite.test.decorators import *
 import lldbsuite.test.lldbutil as lldbutil
 import os
-import unittest2
 
 
 class TestSwiftStdlibDictionary(TestBase):
 
     mydir = TestBase.compute_mydir(__file__)
 
-    def setUp(self):
-        TestBase.setUp(self)
-
     def get_variable(self, name):
+        # Resolve the dynamic type and opt into synthetic children exactly
+        # once per fetch; callers index through the returned ValueObject.
         var = self.frame().FindVariable(
             name).GetDynamicValue(lldb.eDynamicCanRunTarget)
         var.SetPreferSyntheticValue(True)
         return var
 
-    def find_dictionary_entry(
-            self,
-            vdict,
-            key_summary=None,
-            key_value=None,
-            value_summary=None,
-            value_value=None,
-            fail_on_missing=True):
+    def get_dictionary_entries(self, vdict):
+        """Materialize every synthetic child of vdict in one pass and
+        return a key-value -> value-summary map."""
         self.assertTrue(vdict.IsValid(), "invalid Dictionary")
-        count = vdict.GetNumChildren()
-        found = False
-        for i in range(0, count):
-            child = vdict.GetChildAtIndex(i)
+        entries = {}
+        # SBValue.children iterates with a single cached num_children
+        # instead of one GetNumChildren round-trip per index.
+        for child in vdict.children:
             if child.IsValid():
                 key = child.GetChildMemberWithName("key")
                 value = child.GetChildMemberWithName("value")
-
-                key_match = False
-                value_match = False
-
-                if key_value:
-                    if key.GetValue() == key_value:
-                        key_match = True
-                elif key_summary:
-                    if key.GetSummary() == key_summary:
-                        key_match = True
-
-                if value_value:
-                    if value.GetValue() == value_value:
-                        value_match = True
-                elif value_summary:
-                    if value.GetSummary() == value_summary:
-                        value_match = True
-
-                if key_match and value_match:
-                    found = True
-                    break
-
-        if key_value:
-            key_str = str(key_value)
-        else:
-            key_str = str(key_summary)
-
-        if value_value:
-            value_str = str(value_value)
-        else:
-            value_str = str(value_summary)
-
-        if fail_on_missing:
-            self.assertTrue(
-                found, ("could not find an expected child for '%s':'%s'" %
-                        (key_str, value_str)))
-        else:
-            self.assertFalse(
-                found, ("found a not expected child for '%s':'%s'" %
-                        (key_str, value_str)))
+                entries[key.GetValue()] = value.GetSummary()
+        return entries
 
     @swiftTest
     # @skipIfLinux  # bugs.swift.org/SR-844
     def test_swift_stdlib_dictionary(self):
         """Tests that we properly vend synthetic children for Swift.Dictionary"""
         self.build()
-        lldbutil.run_to_source_breakpoint(
-            self, 'break here', lldb.SBFileSpec('main.swift'))
+        lldbutil.run_to_line_breakpoint(
+            self, lldb.SBFileSpec('main.swift'),
+            line_number('main.swift', '// break here'))
 
         # This is the function to remove the custom formats in order to have a
         # clean slate for the next test case.
@@ -108,21 +64,20 @@ class TestSwiftStdlibDictionary(TestBase):
 
         self.runCmd('type summary add a.Wrapper -s ${var.value%S}')
 
+        # Fetch the dictionary once and build a local key -> value-summary
+        # map in a single pass over the synthetic children. Probing for each
+        # key separately would rescan every child through the SB API for all
+        # 100 lookups.
+        entries = self.get_dictionary_entries(self.get_variable("d"))
         for i in range(0, 100):
-            self.find_dictionary_entry(
-                self.get_variable("d"),
-                key_value=str(i),
-                value_summary='"%s"' % (i * 2 + 1))
+            self.assertEqual(
+                entries.get(str(i)), '"%s"' % (i * 2 + 1),
+                "could not find an expected child for '%s'" % i)
 
         self.runCmd('expression d.removeValue(forKey: 34)')
-        self.find_dictionary_entry(
-            self.get_variable("d"),
-            key_value=34,
-            value_summary='"43"',
-            fail_on_missing=False)
-
-if __name__ == '__main__':
-    import atexit
-    lldb.SBDebugger.Initialize()
-    atexit.register(lldb.SBDebugger.Terminate)
-    unittest2.main()
+        # Rebuild the map once after the removal and check it locally
+        # instead of walking the children again per probe.
+        entries = self.get_dictionary_entries(self.get_variable("d"))
+        self.assertNotEqual(
+            entries.get("34"), '"43"',
+            "found a not expected child for '34':'\"43\"'")
@@ -1,14 +1,9 @@
 from __future__ import print_function
 from __future__ import absolute_import
 
-import re
-
-import lldb
-from lldbsuite.test.lldbtest import *
-import lldbsuite.test.lldbutil as lldbutil
-import lldbsuite.test.test_categories as test_categories
 # System modules
 import os
+import re
 import sys
 
 # Third-party modules
@@ -18,6 +13,7 @@ import lldb
 from .lldbtest import *
 from . import configuration
 from . import lldbutil
+from . import test_categories
 from .decorators import *
 
 
@@ -39,6 +35,12 @@ class CommandParser:
         self.breakpoint = None
         self.exprs_and_regexps = []
         self.test = test
+        # One options object serves every expression; rebuilding it on each
+        # breakpoint hit just repeats the same three setter calls.
+        self.options = lldb.SBExpressionOptions()
+        self.options.SetLanguage(lldb.eLanguageTypeSwift)
+        self.options.SetREPLMode(True)
+        self.options.SetFetchDynamicValue(lldb.eDynamicDontRunTarget)
 
     def parse_input(self):
         file_handle = open(inputFile(), 'r')
@@ -46,15 +48,17 @@ class CommandParser:
         current_expression = None
         for line in lines:
             if line.startswith('///'):
-                regexp = line[3:]
+                # Compile the expectation once at parse time; the same
+                # regexps are matched again on every breakpoint hit.
+                regexp = re.compile(line[3:].strip())
                 if current_expression:
                     self.exprs_and_regexps.append(
-                        {'expr': current_expression, 'regexps': [regexp.strip()]})
+                        {'expr': current_expression, 'regexps': [regexp]})
                     current_expression = None
                 else:
                     if len(self.exprs_and_regexps):
                         self.exprs_and_regexps[-1][
-                            'regexps'].append(regexp.strip())
+                            'regexps'].append(regexp)
                     else:
                         sys.exit("Failure parsing test: regexp with no command")
             else:
@@ -72,14 +76,9 @@ class CommandParser:
             frame = thread.GetSelectedFrame()
             if test.TraceOn():
                 print('Stopped at: %s' % frame)
-            options = lldb.SBExpressionOptions()
-            options.SetLanguage(lldb.eLanguageTypeSwift)
-            options.SetREPLMode(True)
-            options.SetFetchDynamicValue(lldb.eDynamicDontRunTarget)
-
+            evaluate = frame.EvaluateExpression
             for expr_and_regexp in self.exprs_and_regexps:
-                ret = frame.EvaluateExpression(
-                    expr_and_regexp['expr'], options)
+                ret = evaluate(expr_and_regexp['expr'], self.options)
                 desc_stream = lldb.SBStream()
                 ret.GetDescription(desc_stream)
                 desc = desc_stream.GetData()
@@ -87,15 +86,13 @@ class CommandParser:
                     print("%s --> %s" % (expr_and_regexp['expr'], desc))
                 for regexp in expr_and_regexp['regexps']:
                     test.assertTrue(
-                        re.search(
-                            regexp,
-                            desc),
+                        regexp.search(desc),
                         "Output of REPL input\n" +
                         expr_and_regexp['expr'] +
                         "was\n" +
                         desc +
                         "which didn't match regexp " +
-                        regexp)
+                        regexp.pattern)
 
             return
 
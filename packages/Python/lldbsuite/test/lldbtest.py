@@ -201,12 +201,27 @@ def SETTING_MSG(setting):
     return "Value of setting '%s' is correct" % setting
 
 
+# Memo for line_number. Tests commonly look up the same marker from setUp
+# for every test method, and the source files do not change during a run,
+# so there is no point re-reading the file each time.
+_line_number_cache = {}
+
+
 def line_number(filename, string_to_match):
     """Helper function to return the line number of the first matched string."""
+    # Callers typically pass a cwd-relative name like "main.swift" and rely
+    # on the test runner having chdir'ed into the test directory, so the
+    # same relative name means a different file for each test class.  Key
+    # on the resolved absolute path to keep the memoization per-file.
+    key = (os.path.abspath(filename), string_to_match)
+    line = _line_number_cache.get(key)
+    if line is not None:
+        return line
     with io.open(filename, mode='r', encoding="utf-8") as f:
         for i, line in enumerate(f):
             if line.find(string_to_match) != -1:
                 # Found our match.
+                _line_number_cache[key] = i + 1
                 return i + 1
     raise Exception(
         "Unable to find '%s' within file %s" %
@@ -490,6 +505,11 @@ class Base(unittest2.TestCase):
     # Keep track of the old current working directory.
     oldcwd = None
 
+    # Cache of compute_mydir results.  Every test module calls it at class
+    # body evaluation time, so repeat imports (and multi-class files) reduce
+    # to a dict lookup.
+    _compute_mydir_cache = {}
+
     @staticmethod
     def compute_mydir(test_file):
         '''Subclasses should call this function to correctly calculate the
@@ -497,9 +517,13 @@ class Base(unittest2.TestCase):
 
             mydir = TestBase.compute_mydir(__file__)
         '''
-        # /abs/path/to/packages/group/subdir/mytest.py -> group/subdir
-        rel_prefix = test_file[len(os.environ["LLDB_TEST"]) + 1:]
-        return os.path.dirname(rel_prefix)
+        mydir = Base._compute_mydir_cache.get(test_file)
+        if mydir is None:
+            # /abs/path/to/packages/group/subdir/mytest.py -> group/subdir
+            rel_prefix = test_file[len(os.environ["LLDB_TEST"]) + 1:]
+            mydir = os.path.dirname(rel_prefix)
+            Base._compute_mydir_cache[test_file] = mydir
+        return mydir
 
     def TraceOn(self):
         """Returns True if we are in trace mode (tracing detailed test execution)."""
@@ -2125,8 +2149,12 @@ class TestBase(Base):
             if matched:
                 break
 
-        self.assertTrue(matched if matching else not matched,
-                        msg if msg else EXP_MSG(str, output, exe))
+        # Only build the failure message (which copies and strips the whole
+        # command output) when the expectation actually failed.
+        success = matched if matching else not matched
+        if not success:
+            self.assertTrue(success,
+                            msg if msg else EXP_MSG(str, output, exe))
 
         return match_object
 
@@ -2137,17 +2165,16 @@ class TestBase(Base):
         num_matches = interp.HandleCompletionWithDescriptions(str_input, len(str_input), 0, -1, match_strings, description_strings)
         self.assertEqual(len(description_strings), len(match_strings))
 
-        missing_pairs = []
-        for pair in match_desc_pairs:
-            found_pair = False
-            for i in range(num_matches + 1):
-                match_candidate = match_strings.GetStringAtIndex(i)
-                description_candidate = description_strings.GetStringAtIndex(i)
-                if match_candidate == pair[0] and description_candidate == pair[1]:
-                    found_pair = True
-                    break
-            if not found_pair:
-                missing_pairs.append(pair)
+        # Fetch each completion from the SBAPI once and hash the pairs, so
+        # checking an expected pair is a set lookup instead of a rescan of
+        # all the matches (which crosses the SBAPI boundary per candidate).
+        found_pairs = set()
+        for i in range(num_matches + 1):
+            found_pairs.add((match_strings.GetStringAtIndex(i),
+                             description_strings.GetStringAtIndex(i)))
+
+        missing_pairs = [pair for pair in match_desc_pairs
+                         if (pair[0], pair[1]) not in found_pairs]
 
         if len(missing_pairs):
             error_msg = "Missing pairs:\n"
@@ -2350,30 +2377,58 @@ FileCheck output:
         # Look for sub strings, if specified.
         keepgoing = matched if matching else not matched
         if substrs and keepgoing:
-            for substr in substrs:
-                matched = output.find(substr) != -1
-                with recording(self, trace) as sbuf:
-                    print("%s sub string: %s" % (heading, substr), file=sbuf)
-                    print("Matched" if matched else "Not matched", file=sbuf)
-                keepgoing = matched if matching else not matched
-                if not keepgoing:
-                    break
+            if not trace:
+                # Without tracing there is nothing to report per substring,
+                # so decide the aggregate result in one short-circuiting
+                # pass instead of paying a recording context per needle.
+                if matching:
+                    matched = all(substr in output for substr in substrs)
+                else:
+                    matched = any(substr in output for substr in substrs)
+            else:
+                for substr in substrs:
+                    matched = output.find(substr) != -1
+                    with recording(self, trace) as sbuf:
+                        print("%s sub string: %s" % (heading, substr),
+                              file=sbuf)
+                        print("Matched" if matched else "Not matched",
+                              file=sbuf)
+                    keepgoing = matched if matching else not matched
+                    if not keepgoing:
+                        break
 
         # Search for regular expression patterns, if specified.
         keepgoing = matched if matching else not matched
         if patterns and keepgoing:
-            for pattern in patterns:
+            if not trace:
                 # Match Objects always have a boolean value of True.
-                matched = bool(re.search(pattern, output))
-                with recording(self, trace) as sbuf:
-                    print("%s pattern: %s" % (heading, pattern), file=sbuf)
-                    print("Matched" if matched else "Not matched", file=sbuf)
-                keepgoing = matched if matching else not matched
-                if not keepgoing:
-                    break
-
-        self.assertTrue(matched if matching else not matched,
-                        msg if msg else EXP_MSG(str, output, exe))
+                if matching:
+                    matched = all(
+                        bool(re.search(pattern, output))
+                        for pattern in patterns)
+                else:
+                    matched = any(
+                        bool(re.search(pattern, output))
+                        for pattern in patterns)
+            else:
+                for pattern in patterns:
+                    # Match Objects always have a boolean value of True.
+                    matched = bool(re.search(pattern, output))
+                    with recording(self, trace) as sbuf:
+                        print("%s pattern: %s" % (heading, pattern),
+                              file=sbuf)
+                        print("Matched" if matched else "Not matched",
+                              file=sbuf)
+                    keepgoing = matched if matching else not matched
+                    if not keepgoing:
+                        break
+
+        # Only build the failure message (which copies and strips the whole
+        # command output) when the expectation actually failed.
+        success = matched if matching else not matched
+        if not success:
+            self.assertTrue(success,
+                            msg if msg else EXP_MSG(str, output, exe))
 
     def invoke(self, obj, name, trace=False):
         """Use reflection to call a method dynamically with no argument."""
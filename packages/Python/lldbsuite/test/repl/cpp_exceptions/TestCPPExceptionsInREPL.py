@@ -5,9 +5,6 @@ Make sure we don't trap exceptions with SetREPLEnabled(true) or "lldb --repl"
 from __future__ import print_function
 
 
-import os
-import time
-import re
 import subprocess
 import lldb
 import swift
@@ -11,7 +11,6 @@
 // -----------------------------------------------------------------------------
 
 class A {init(a: Int) {}}
-///
 class B : A {let x: Int; init() { x = 5 + 5; super.init(a: x) } }
 ///
 B().x
@@ -9,13 +9,77 @@ Python binding preparation script.
 # Python modules:
 from __future__ import print_function
 
+import itertools
 import logging
 import os
-import re
-import shutil
 import subprocess
 import sys
-import platform
+
+
+# This script's own directory, and the swig support files that live next
+# to it, never change for the life of the process; walk the symlinks once
+# at import time instead of on every main() call.
+_SCRIPTS_PYTHON_DIR = os.path.dirname(os.path.realpath(__file__))
+_EXTENSIONS_FILE = os.path.normcase(
+    os.path.join(_SCRIPTS_PYTHON_DIR, "python-extensions.swig"))
+_WRAPPER_FILE = os.path.normcase(
+    os.path.join(_SCRIPTS_PYTHON_DIR, "python-wrapper.swig"))
+_TYPEMAPS_FILE = os.path.normcase(
+    os.path.join(_SCRIPTS_PYTHON_DIR, "python-typemaps.swig"))
+_SAFECAST_FILE = os.path.normcase(
+    os.path.join(_SCRIPTS_PYTHON_DIR, "python-swigsafecast.swig"))
+
+
+# Modification times seeded by the directory scans in get_header_files and
+# get_interface_files, so the out-of-date check does not re-stat paths the
+# scan just visited.
+_mtime_cache = {}
+
+
+def _getmtime(path):
+    """Returns the modification time of path, preferring the cached value."""
+    mtime = _mtime_cache.get(path)
+    if mtime is None:
+        mtime = os.path.getmtime(path)
+        _mtime_cache[path] = mtime
+    return mtime
+
+
+# Existence checks memoized for the lifetime of the process.  The same
+# paths (the binding output file, the static binding sources) are checked
+# by several functions in a single prepare pass, and nothing modifies a
+# path before all the checks that read it have run.  Paths the script
+# itself writes mid-run (e.g. the swig dependency temp file) must keep
+# using os.path.exists directly.
+_exists_cache = {}
+
+
+def _cached_exists(path):
+    """Returns whether path exists, statting each path at most once."""
+    exists = _exists_cache.get(path)
+    if exists is None:
+        exists = os.path.exists(path)
+        _exists_cache[path] = exists
+    return exists
+
+
+def _files_equal(lhs_path, rhs_path):
+    """Returns whether two files have identical contents.
+
+    Differing sizes short-circuit without reading either file; otherwise
+    the files are compared in fixed-size chunks rather than pulling both
+    into memory at once the way filecmp's content check does.
+    """
+    if os.path.getsize(lhs_path) != os.path.getsize(rhs_path):
+        return False
+    chunk_size = 64 * 1024
+    with open(lhs_path, 'rb') as lhs, open(rhs_path, 'rb') as rhs:
+        while True:
+            lhs_chunk = lhs.read(chunk_size)
+            if lhs_chunk != rhs.read(chunk_size):
+                return False
+            if not lhs_chunk:
+                return True
 
 
 class SwigSettings(object):
@@ -31,38 +95,6 @@ class SwigSettings(object):
         self.typemaps_file = None
         self.wrapper_file = None
 
-    @classmethod
-    def _any_files_newer(cls, files, check_mtime):
-        """Returns if any of the given files has a newer modified time.
-
-        @param cls the class
-        @param files a list of zero or more file paths to check
-        @param check_mtime the modification time to use as a reference.
-
-        @return True if any file's modified time is newer than check_mtime.
-        """
-        for path in files:
-            path_mtime = os.path.getmtime(path)
-            if path_mtime > check_mtime:
-                # This path was modified more recently than the
-                # check_mtime.
-                return True
-        # If we made it here, nothing was newer than the check_mtime
-        return False
-
-    @classmethod
-    def _file_newer(cls, path, check_mtime):
-        """Tests how recently a file has been modified.
-
-        @param cls the class
-        @param path a file path to check
-        @param check_mtime the modification time to use as a reference.
-
-        @return True if the file's modified time is newer than check_mtime.
-        """
-        path_mtime = os.path.getmtime(path)
-        return path_mtime > check_mtime
-
     def output_out_of_date(self):
         """Returns whether the output file is out of date.
 
@@ -72,30 +104,29 @@ class SwigSettings(object):
         the output file, or if the output file doesn't exist;
         False otherwise.
         """
-        if not os.path.exists(self.output_file):
+        if not _cached_exists(self.output_file):
             logging.info("will generate, missing binding output file")
             return True
-        output_mtime = os.path.getmtime(self.output_file)
-        if self._any_files_newer(self.header_files, output_mtime):
-            logging.info("will generate, header files newer")
-            return True
-        if self._any_files_newer(self.interface_files, output_mtime):
-            logging.info("will generate, interface files newer")
-            return True
-        if self._file_newer(self.input_file, output_mtime):
-            logging.info("will generate, swig input file newer")
-            return True
-        if self._file_newer(self.extensions_file, output_mtime):
-            logging.info("will generate, swig extensions file newer")
-            return True
-        if self._file_newer(self.wrapper_file, output_mtime):
-            logging.info("will generate, swig wrapper file newer")
-            return True
-        if self._file_newer(self.typemaps_file, output_mtime):
-            logging.info("will generate, swig typemaps file newer")
-            return True
-        if self._file_newer(self.safecast_file, output_mtime):
-            logging.info("will generate, swig safecast file newer")
+        output_mtime = _getmtime(self.output_file)
+
+        # One short-circuiting pass over every input instead of a
+        # separate loop per category; naming the file that triggered
+        # regeneration is also more useful in the log than the old
+        # per-category messages.
+        all_inputs = itertools.chain(
+            self.header_files,
+            self.interface_files,
+            [self.input_file,
+             self.extensions_file,
+             self.wrapper_file,
+             self.typemaps_file,
+             self.safecast_file])
+        newer_input = next(
+            (path for path in all_inputs
+             if _getmtime(path) > output_mtime),
+            None)
+        if newer_input is not None:
+            logging.info("will generate, newer input file: %s", newer_input)
             return True
 
         # If we made it here, nothing is newer than the output file.
@@ -115,7 +146,11 @@ def get_header_files(options):
     """
 
     header_file_paths = []
-    header_base_dir = os.path.join(options.src_root, "include", "lldb")
+    # Normalize the base directory once; the per-file paths below then
+    # only need a separator and a name appended, rather than a
+    # join+normcase pair each.
+    header_base_dir = os.path.normcase(
+        os.path.join(options.src_root, "include", "lldb"))
 
     # Specify the include files in include/lldb that are not easy to
     # grab programatically.
@@ -124,21 +159,33 @@ def get_header_files(options):
             "lldb-enumerations.h",
             "lldb-forward.h",
             "lldb-types.h"]:
-        header_file_paths.append(os.path.normcase(
-            os.path.join(header_base_dir, header)))
+        header_file_paths.append(header_base_dir + os.sep + header)
 
     # Include the main LLDB.h file.
-    api_dir = os.path.join(header_base_dir, "API")
-    header_file_paths.append(os.path.normcase(
-        os.path.join(api_dir, "LLDB.h")))
-
-    filename_regex = re.compile(r"^SB.+\.h$")
-
-    # Include all the SB*.h files in the API dir.
-    for filename in os.listdir(api_dir):
-        if filename_regex.match(filename):
-            header_file_paths.append(
-                os.path.normcase(os.path.join(api_dir, filename)))
+    api_dir = header_base_dir + os.sep + "API"
+    header_file_paths.append(api_dir + os.sep + "LLDB.h")
+
+    # Matching "^SB.+\.h$" only needs prefix/suffix checks, so skip the
+    # regex engine for the per-entry filter.
+    def is_sb_header(filename):
+        return (filename.startswith("SB") and filename.endswith(".h")
+                and len(filename) > len("SB.h"))
+
+    # Include all the SB*.h files in the API dir.  scandir reads the
+    # directory once with batched stats, and remembering each entry's
+    # mtime spares output_out_of_date a stat per header; Python 2 has no
+    # scandir, so fall back to the plain listing there.
+    if hasattr(os, "scandir"):
+        for entry in os.scandir(api_dir):
+            if is_sb_header(entry.name) and entry.is_file():
+                # entry.path is already the joined path under the
+                # normalized base directory.
+                _mtime_cache[entry.path] = entry.stat().st_mtime
+                header_file_paths.append(entry.path)
+    else:
+        for filename in os.listdir(api_dir):
+            if is_sb_header(filename):
+                header_file_paths.append(api_dir + os.sep + filename)
 
     logging.debug("found public API header file paths: %s", header_file_paths)
     return header_file_paths
@@ -153,30 +200,28 @@ def get_interface_files(options):
     the public API language binding.
     """
     interface_file_paths = []
-    interface_dir = os.path.join(options.src_root, "scripts", "interface")
-
-    for filepath in [f for f in os.listdir(interface_dir)
-                     if os.path.splitext(f)[1] == ".i"]:
-        interface_file_paths.append(
-            os.path.normcase(os.path.join(interface_dir, filepath)))
+    # As in get_header_files, normalize the base directory once so each
+    # entry costs a concatenation instead of a join+normcase pair.
+    interface_dir = os.path.normcase(
+        os.path.join(options.src_root, "scripts", "interface"))
+
+    if hasattr(os, "scandir"):
+        for entry in os.scandir(interface_dir):
+            # endswith is a plain suffix compare, cheaper than splitting
+            # the extension off every name, and is_file reuses the stat
+            # the directory scan already fetched.
+            if entry.name.endswith(".i") and entry.is_file():
+                _mtime_cache[entry.path] = entry.stat().st_mtime
+                interface_file_paths.append(entry.path)
+    else:
+        for filepath in [f for f in os.listdir(interface_dir)
+                         if os.path.splitext(f)[1] == ".i"]:
+            interface_file_paths.append(interface_dir + os.sep + filepath)
 
     logging.debug("found swig interface files: %s", interface_file_paths)
     return interface_file_paths
 
 
-def remove_ignore_enoent(filename):
-    """Removes given file, ignoring error if it doesn't exist.
-
-    @param filename the path of the file to remove.
-    """
-    try:
-        os.remove(filename)
-    except OSError as error:
-        import errno
-        if error.errno != errno.ENOENT:
-            raise
-
-
 def do_swig_rebuild(options, dependency_file, config_build_dir, settings):
     """Generates Python bindings file from swig.
 
@@ -247,7 +292,14 @@ def do_swig_rebuild(options, dependency_file, config_build_dir, settings):
     # Move the depedency file we just generated to the proper location.
     if options.generate_dependency_file:
         if os.path.exists(temp_dep_file_path):
-            shutil.move(temp_dep_file_path, dependency_file)
+            # Both paths live in the same directory, so this is a single
+            # atomic rename; os.replace needs Python 3, so older
+            # interpreters keep shutil.move.
+            if hasattr(os, "replace"):
+                os.replace(temp_dep_file_path, dependency_file)
+            else:
+                import shutil
+                shutil.move(temp_dep_file_path, dependency_file)
         else:
             logging.error(
                 "failed to generate Python binding depedency file '%s'",
@@ -275,53 +327,51 @@ def static_binding_paths(options):
     return (lldb_wrap_python_src_path, lldb_py_src_path)
 
 
-def copy_static_bindings(options, config_build_dir, settings):
-    """Copies the static Python bindings over to the build dir.
+def _sync_if_different(src_path, dest_path, freshen_on_match=False):
+    """Copies src_path over dest_path only if their contents differ.
+
+    When the contents already match, the destination is normally left
+    completely untouched so mtime-based downstream build steps do not
+    see a change.  Pass freshen_on_match=True on paths where the old
+    unconditional copy was relied on to mark the output current - there
+    the mtime is refreshed without rewriting the contents.
+
+    @return True if the destination was rewritten, False if it already
+    matched the source.
     """
-    lldb_wrap_python_src_path, lldb_py_src_path = static_binding_paths(options)
-    # Copy the LLDBWrapPython.cpp C++ binding file impl over.
-    if not os.path.exists(lldb_wrap_python_src_path):
-        logging.error(
-            "failed to find static Python binding .cpp file at '%s'",
-            lldb_wrap_python_src_path)
-        sys.exit(-12)
-    shutil.copyfile(lldb_wrap_python_src_path, settings.output_file)
+    if _cached_exists(dest_path) and _files_equal(src_path, dest_path):
+        if freshen_on_match:
+            os.utime(dest_path, None)
+        return False
+    # Deferred so the up-to-date fast path never pays for the import.
+    import shutil
+    shutil.copyfile(src_path, dest_path)
+    return True
 
-    # Copy the lldb.py impl over.
-    if not os.path.exists(lldb_py_src_path):
-        logging.error(
-            "failed to find static Python binding .py file at '%s'",
-            lldb_py_src_path)
-        sys.exit(-13)
-    lldb_py_dest_path = os.path.join(
-        os.path.dirname(settings.output_file),
-        "lldb.py")
-    shutil.copyfile(lldb_py_src_path, lldb_py_dest_path)
 
+def copy_static_bindings(options, config_build_dir, settings,
+                         freshen_on_match=False):
+    """Syncs the static Python bindings into the build dir.
 
-def static_bindings_require_refresh(options, config_build_dir, settings):
-    """Returns whether existing static bindings require an update."""
+    Each binding file is compared against the build-dir copy and only
+    rewritten when it changed, so calling this on an up-to-date tree is
+    one streaming compare per file rather than a compare plus a copy.
+    freshen_on_match is passed through to _sync_if_different.
+
+    @return True if either binding file was rewritten.
+    """
     lldb_wrap_python_src_path, lldb_py_src_path = static_binding_paths(options)
-    # Check if LLDBWrapPython.cpp C++ static binding is different than
-    # in the build dir.
-    if not os.path.exists(lldb_wrap_python_src_path):
+    # Sync the LLDBWrapPython.cpp C++ binding file impl over.
+    if not _cached_exists(lldb_wrap_python_src_path):
         logging.error(
             "failed to find static Python binding .cpp file at '%s'",
             lldb_wrap_python_src_path)
         sys.exit(-12)
-    if not os.path.exists(settings.output_file):
-        # We for sure need an update.
-        # Note this should already be True - we don't check
-        # for a refresh if we already know we have to generate them.
-        return True
-    import filecmp
-    if not filecmp.cmp(
-            lldb_wrap_python_src_path, settings.output_file, shallow=False):
-        return True
-
-    # Check if the lldb.py Python static binding is different than
-    # in the build dir.
-    if not os.path.exists(lldb_py_src_path):
+    updated = _sync_if_different(
+        lldb_wrap_python_src_path, settings.output_file, freshen_on_match)
+
+    # Sync the lldb.py impl over.
+    if not _cached_exists(lldb_py_src_path):
         logging.error(
             "failed to find static Python binding .py file at '%s'",
             lldb_py_src_path)
@@ -329,17 +379,9 @@ def static_bindings_require_refresh(options, config_build_dir, settings):
     lldb_py_dest_path = os.path.join(
         os.path.dirname(settings.output_file),
         "lldb.py")
-    if not os.path.exists(lldb_py_dest_path):
-        # We for sure need an update.
-        # Note this should already be True - we don't check
-        # for a refresh if we already know we have to generate them.
-        return True
-    if not filecmp.cmp(
-            lldb_py_src_path, lldb_py_dest_path, shallow=False):
-        return True
-
-    # If we made it here, we don't need to update.
-    return False
+    updated = _sync_if_different(
+        lldb_py_src_path, lldb_py_dest_path, freshen_on_match) or updated
+    return updated
 
 
 def get_python_module_path(options):
@@ -395,9 +437,9 @@ def main(options):
     # is disabled.
     disable_python = os.getenv("LLDB_DISABLE_PYTHON", None)
     if disable_python is not None and disable_python == "1":
-        remove_ignore_enoent(settings.output_file)
-        # Touch the file.
-        open(settings.output_file, 'w').close()
+        # Truncate (or create) the file; O_TRUNC covers the
+        # previously-existing case, so no separate unlink is needed.
+        open(settings.output_file, 'wb').close()
         logging.info(
             "Created empty python binding file due to LLDB_DISABLE_PYTHON "
             "being set")
@@ -408,10 +450,9 @@ def main(options):
     # the binding.
     gcc_preprocessor_defs = os.getenv("GCC_PREPROCESSOR_DEFINITIONS", None)
     if gcc_preprocessor_defs is not None:
-        if re.search(r"LLDB_DISABLE_PYTHON", gcc_preprocessor_defs):
-            remove_ignore_enoent(settings.output_file)
-            # Touch the file
-            open(settings.output_file, 'w').close()
+        if "LLDB_DISABLE_PYTHON" in gcc_preprocessor_defs:
+            # Truncate (or create) the file, as above.
+            open(settings.output_file, 'wb').close()
             logging.info(
                 "Created empty python binding file due to "
                 "finding LLDB_DISABLE_PYTHON in GCC_PREPROCESSOR_DEFINITIONS")
@@ -420,15 +461,10 @@ def main(options):
     # Setup paths used during swig invocation.
     settings.input_file = os.path.normcase(
         os.path.join(options.src_root, "scripts", "lldb.swig"))
-    scripts_python_dir = os.path.dirname(os.path.realpath(__file__))
-    settings.extensions_file = os.path.normcase(
-        os.path.join(scripts_python_dir, "python-extensions.swig"))
-    settings.wrapper_file = os.path.normcase(
-        os.path.join(scripts_python_dir, "python-wrapper.swig"))
-    settings.typemaps_file = os.path.normcase(
-        os.path.join(scripts_python_dir, "python-typemaps.swig"))
-    settings.safecast_file = os.path.normcase(
-        os.path.join(scripts_python_dir, "python-swigsafecast.swig"))
+    settings.extensions_file = _EXTENSIONS_FILE
+    settings.wrapper_file = _WRAPPER_FILE
+    settings.typemaps_file = _TYPEMAPS_FILE
+    settings.safecast_file = _SAFECAST_FILE
 
     settings.header_files = get_header_files(options)
     settings.interface_files = get_interface_files(options)
@@ -449,7 +485,7 @@ def main(options):
     if not generate_output:
         # Ensure the _lldb.so file exists.
         so_path = os.path.join(python_module_path, "_lldb.so")
-        if not os.path.exists(so_path) or not os.path.islink(so_path):
+        if not _cached_exists(so_path) or not os.path.islink(so_path):
             logging.info("_lldb.so doesn't exist or isn't a symlink")
             generate_output = True
 
@@ -457,23 +493,25 @@ def main(options):
     if not generate_output:
         # Ensure the __init__.py for the lldb module can be found.
         init_path = os.path.join(python_module_path, "__init__.py")
-        if not os.path.exists(init_path):
+        if not _cached_exists(init_path):
             logging.info("__init__.py doesn't exist")
             generate_output = True
 
     # Figure out if we would be using static bindings
     use_static_bindings = (
         not options.swig_executable or
-        not os.path.exists(options.swig_executable))
+        not _cached_exists(options.swig_executable))
     if use_static_bindings and not generate_output:
-        # If the contents of the VCS static binding are different from what
-        # we have in the build dir, we should copy them regardless.
-        if static_bindings_require_refresh(
-                options, config_build_dir, settings):
-            # Force the static bindings to be copied later on, thus preventing
-            # early exit from this method.
-            logging.info("updating static binding due to VCS binding changes")
-            generate_output = True
+        # Sync the VCS static bindings straight into the build dir; the
+        # sync only rewrites files whose contents differ, so the old
+        # compare-then-copy pair (two full reads of each binding)
+        # collapses into this single pass.
+        if copy_static_bindings(options, config_build_dir, settings):
+            logging.info("updated static binding due to VCS binding changes")
+        else:
+            logging.info(
+                "Skipping Python binding generation: everything is up to date")
+        return
 
     if not generate_output:
         logging.info(
@@ -485,8 +523,11 @@ def main(options):
     if use_static_bindings:
         # Copy over the static bindings.  We capture the the modified (
         # i.e. post-processed) binding, so we don't do the modify step
-        # here - the modifications have already been applied.
-        copy_static_bindings(options, config_build_dir, settings)
+        # here - the modifications have already been applied.  The old
+        # code copied unconditionally on this path, so matching contents
+        # still get their mtime refreshed to mark the output current.
+        copy_static_bindings(options, config_build_dir, settings,
+                             freshen_on_match=True)
     else:
         # Generate the Python binding with swig.
         logging.info("Python binding is out of date, regenerating")